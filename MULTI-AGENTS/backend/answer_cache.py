@@ -0,0 +1,121 @@
+# answer_cache.py
+# Cache de respuestas delante de ask_agent.ask():
+#   1) exacto por (assistant_id, pregunta normalizada) con TTL
+#   2) semántico: reutiliza la respuesta de una pregunta "casi igual" (coseno)
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from oai import async_client as client
+
+ANSWER_CACHE_SIZE = settings.answer_cache_size
+ANSWER_CACHE_TTL_S = settings.answer_cache_ttl_s
+# 0 desactiva el tier semántico (evita la llamada de embeddings en cada miss)
+SEMANTIC_CACHE_THRESHOLD = settings.semantic_cache_threshold
+SEMANTIC_CACHE_SIZE = settings.semantic_cache_size  # por asistente
+EMBEDDING_MODEL = settings.embedding_model
+
+Answer = Tuple[str, List[str]]
+Key = Tuple[str, str]
+
+_entries: "OrderedDict[Key, Tuple[float, Answer]]" = OrderedDict()
+# assistant_id -> (preguntas normalizadas, matriz de embeddings normalizados)
+_index: Dict[str, Tuple[List[str], np.ndarray]] = {}
+
+CACHE_STATS = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+
+def normalize(question: str) -> str:
+    return " ".join(question.strip().lower().split())
+
+
+def _unindex(key: Key) -> None:
+    # Quita el vector de una entrada expirada/desalojada (listas nuevas, no mutación)
+    assistant_id, q = key
+    indexed = _index.get(assistant_id)
+    if indexed is None or q not in indexed[0]:
+        return
+    questions, matrix = indexed
+    i = questions.index(q)
+    _index[assistant_id] = (questions[:i] + questions[i + 1:], np.delete(matrix, i, axis=0))
+
+
+def _get(key: Key) -> Optional[Answer]:
+    item = _entries.get(key)
+    if item is None:
+        return None
+    expires_at, answer = item
+    if expires_at < time.monotonic():
+        del _entries[key]
+        _unindex(key)
+        return None
+    _entries.move_to_end(key)
+    return answer
+
+
+async def _embed(text: str) -> Optional[np.ndarray]:
+    try:
+        resp = await client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+    except Exception:
+        # Silencioso: sin embedding solo queda el tier exacto
+        return None
+    vec = np.asarray(resp.data[0].embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else None
+
+
+def lookup_exact(assistant_id: str, question: str) -> Optional[Answer]:
+    """Tier exacto: solo memoria, sin llamadas de red."""
+    answer = _get((assistant_id, normalize(question)))
+    if answer is not None:
+        CACHE_STATS["exact_hits"] += 1
+    return answer
+
+
+async def lookup_semantic(assistant_id: str, question: str) -> Tuple[Optional[Answer], Optional[np.ndarray]]:
+    """
+    Tier semántico (tras un miss exacto): pide el embedding de la pregunta.
+    Devuelve (respuesta_cacheada | None, embedding | None); el embedding se
+    devuelve para reutilizarlo en store() tras un miss.
+    """
+    q = normalize(question)
+    vec = None
+    if SEMANTIC_CACHE_THRESHOLD > 0:
+        vec = await _embed(q)
+        indexed = _index.get(assistant_id)
+        if vec is not None and indexed is not None:
+            questions, matrix = indexed
+            scores = matrix @ vec
+            # Mejores candidatos primero; se salta alguno que haya expirado
+            for i in np.argsort(-scores):
+                if scores[i] < SEMANTIC_CACHE_THRESHOLD:
+                    break
+                answer = _get((assistant_id, questions[i]))
+                if answer is not None:
+                    CACHE_STATS["semantic_hits"] += 1
+                    return answer, vec
+
+    CACHE_STATS["misses"] += 1
+    return None, vec
+
+
+def store(assistant_id: str, question: str, answer: Answer, vec: Optional[np.ndarray] = None) -> None:
+    q = normalize(question)
+    key = (assistant_id, q)
+    _entries[key] = (time.monotonic() + ANSWER_CACHE_TTL_S, answer)
+    _entries.move_to_end(key)
+    while len(_entries) > ANSWER_CACHE_SIZE:
+        evicted, _ = _entries.popitem(last=False)
+        _unindex(evicted)
+
+    if vec is None:
+        return
+    questions, matrix = _index.get(assistant_id, ([], np.empty((0, vec.shape[0]), dtype=np.float32)))
+    if q in questions:
+        return
+    questions = (questions + [q])[-SEMANTIC_CACHE_SIZE:]
+    matrix = np.vstack([matrix, vec])[-SEMANTIC_CACHE_SIZE:]
+    _index[assistant_id] = (questions, matrix)
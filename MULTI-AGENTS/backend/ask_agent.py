@@ -1,40 +1,46 @@
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
-import os
 import sys
 import time
+import asyncio
+import re
 import argparse
-from typing import List, Tuple, Optional, Dict, Any
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Dict, Any, AsyncIterator, Mapping
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from openai import NOT_GIVEN, APIConnectionError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 from typing_extensions import override
 
+import answer_cache
+from citations import replace_annotations
+from config import settings
+from envfile import load_kv
+from oai import async_client
+
 # =========================
 # Config & bootstrap
 # =========================
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = async_client
+
+POLL_INTERVAL = settings.poll_interval
+POLL_TIMEOUT_S = settings.poll_timeout_s  # 2 min
+BACKOFF_FACTOR = settings.backoff_factor  # backoff geométrico
+POLL_MAX_INTERVAL = settings.poll_max_interval  # no más de 2s
+
+# Límite de preguntas simultáneas contra OpenAI (rate limits)
+OAI_SEMAPHORE = asyncio.Semaphore(settings.oai_concurrency)
 
-POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "0.8"))
-POLL_TIMEOUT_S = int(os.getenv("POLL_TIMEOUT_S", "120"))  # 2 min
-BACKOFF_FACTOR = float(os.getenv("BACKOFF_FACTOR", "1.15"))  # leve backoff
+# Pedir los run steps solo para el "[debug] Chunks usados: N"
+DEBUG_CHUNKS = settings.debug_chunks
 
 
 # =========================
 # Cargar IDs de asistentes
 # =========================
-def load_agent_ids(path: str = "agent_ids.env") -> Dict[str, str]:
-    ids = {}
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or "=" not in line:
-                continue
-            k, v = line.split("=", 1)
-            ids[k] = v
-    return ids
+def load_agent_ids(path: str = "agent_ids.env") -> Mapping[str, str]:
+    return load_kv(path)
 
 
 AGENTS = load_agent_ids()
@@ -46,16 +52,76 @@ AGENT_MAP = {
 }
 
 
+# =========================
+# Cache de filenames (metadata inmutable)
+# =========================
+FILENAME_CACHE_SIZE = settings.filename_cache_size
+_filename_cache: "OrderedDict[str, str]" = OrderedDict()
+_filename_lock = asyncio.Lock()
+
+
+async def _remember_filename(file_id: str, filename: str) -> None:
+    async with _filename_lock:
+        _filename_cache[file_id] = filename
+        _filename_cache.move_to_end(file_id)
+        while len(_filename_cache) > FILENAME_CACHE_SIZE:
+            _filename_cache.popitem(last=False)
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(min=0.1, max=2),
+    retry=retry_if_exception_type((APIConnectionError, RateLimitError)),
+    reraise=True,
+)
+async def _retrieve_filename(file_id: str) -> str:
+    # Solo se reintentan errores transitorios (red / rate limit); los reintentos
+    # del SDK se apagan para que tenacity sea la única política
+    meta = await client.with_options(max_retries=0).files.retrieve(file_id)
+    return getattr(meta, "filename", file_id)
+
+
+async def _filename_for(file_id: str) -> str:
+    """
+    Devuelve el filename de un file_id, consultando a OpenAI solo la primera vez.
+    """
+    async with _filename_lock:
+        if file_id in _filename_cache:
+            _filename_cache.move_to_end(file_id)
+            return _filename_cache[file_id]
+    filename = await _retrieve_filename(file_id)
+    await _remember_filename(file_id, filename)
+    return filename
+
+
+async def warm_filename_cache() -> None:
+    """
+    Precarga el cache con los archivos de propósito 'assistants', hasta
+    FILENAME_CACHE_SIZE elementos. Pensado para correr en segundo plano.
+    Silencioso si falla: el cache se llena bajo demanda.
+    """
+    try:
+        n = 0
+        async for f in client.files.list(purpose="assistants"):
+            await _remember_filename(f.id, getattr(f, "filename", f.id))
+            n += 1
+            if n >= FILENAME_CACHE_SIZE:
+                break
+    except Exception:
+        pass
+
+
 # =========================
 # Utilidades de citas
 # =========================
-def extract_answer_and_citations_from_message(message) -> Tuple[str, List[str]]:
+async def extract_answer_and_citations_from_message(message) -> Tuple[str, List[str]]:
     """
     Extrae texto y referencias de archivos (si existen) del último mensaje del asistente.
-    Usa anotaciones del mensaje.
+    Usa anotaciones del mensaje; los filenames citados se piden en paralelo.
     """
     text_out: List[str] = []
     citations: List[str] = []
+    pending: List[Tuple[int, str]] = []  # (marcador, file_id)
 
     for part in message.content:
         if part.type != "text":
@@ -64,19 +130,20 @@ def extract_answer_and_citations_from_message(message) -> Tuple[str, List[str]]:
         value = text_obj.value or ""
         annotations = getattr(text_obj, "annotations", []) or []
 
-        # Reemplazar el fragmento anotado por [n] y acumular filenames citados
+        # Reemplazar los fragmentos anotados por [n] y acumular filenames citados
+        marker_for = {idx: idx for idx in range(len(annotations))}
+        try:
+            value, marker_for = replace_annotations(value, annotations)
+        except Exception:
+            # Silencioso si las anotaciones vienen malformadas
+            pass
         for idx, ann in enumerate(annotations):
             try:
-                # Reemplaza el texto anotado por [n]
-                if hasattr(ann, "text") and ann.text:
-                    value = value.replace(ann.text, f"[{idx}]")
-                # Si hay file_citation, obtener filename
+                # Si hay file_citation, se resuelve el filename más abajo
+                # (solo si su marcador quedó en el texto)
                 file_citation = getattr(ann, "file_citation", None)
-                if file_citation and getattr(file_citation, "file_id", None):
-                    meta = client.files.retrieve(file_citation.file_id)
-                    citations.append(
-                        f"[{idx}] {getattr(meta, 'filename', file_citation.file_id)}"
-                    )
+                if idx in marker_for and file_citation and getattr(file_citation, "file_id", None):
+                    pending.append((marker_for[idx], file_citation.file_id))
             except Exception:
                 # Silencioso si alguna anotación falla
                 pass
@@ -84,10 +151,22 @@ def extract_answer_and_citations_from_message(message) -> Tuple[str, List[str]]:
         if value:
             text_out.append(value)
 
+    filenames = await asyncio.gather(
+        *[_filename_for(fid) for _, fid in pending],
+        return_exceptions=True,
+    )
+    for (idx, _), filename in zip(pending, filenames):
+        if isinstance(filename, Exception):
+            # Silencioso si algún retrieve falla
+            continue
+        citation = f"[{idx}] {filename}"
+        if citation not in citations:
+            citations.append(citation)
+
     return ("\n".join(text_out).strip(), citations)
 
 
-def try_fetch_file_search_chunks(thread_id: str, run_id: str) -> List[str]:
+async def try_fetch_file_search_chunks(thread_id: str, run_id: str) -> List[str]:
     """
     Intenta obtener detalles de File Search desde los run steps.
     Si el SDK expone `include`, listamos los steps y tratamos de recuperar
@@ -95,7 +174,7 @@ def try_fetch_file_search_chunks(thread_id: str, run_id: str) -> List[str]:
     """
     chunks: List[str] = []
     try:
-        steps = client.beta.threads.runs.steps.list(thread_id=thread_id, run_id=run_id)
+        steps = await client.beta.threads.runs.steps.list(thread_id=thread_id, run_id=run_id)
         for step in steps.data:
             sd = getattr(step, "step_details", None)
             if not sd:
@@ -123,99 +202,250 @@ def try_fetch_file_search_chunks(thread_id: str, run_id: str) -> List[str]:
     return chunks
 
 
+def _with_debug(answer: str, fs_chunks: List[str]) -> str:
+    if fs_chunks:
+        # No saturar salida; solo decimos cuántos chunks
+        answer += f"\n\n[debug] Chunks usados: {len(fs_chunks)}"
+    return answer
+
+
 # =========================
 # Polling robusto del run
 # =========================
-def poll_run(thread_id: str, run_id: str, timeout_s: int = POLL_TIMEOUT_S) -> Any:
+async def poll_run(thread_id: str, run_id: str, timeout_s: int = POLL_TIMEOUT_S) -> Any:
     """
     Hace polling hasta que el run termina o vence el timeout.
+    Intervalo adaptativo: arranca corto (runs rápidos se observan enseguida) y
+    crece geométricamente hasta POLL_MAX_INTERVAL; respeta Retry-After y nunca
+    duerme más allá del timeout ni del expires_at del run.
     Devuelve el objeto run final.
     """
-    start = time.time()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
     interval = POLL_INTERVAL
     while True:
-        run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+        raw = await client.beta.threads.runs.with_raw_response.retrieve(
+            thread_id=thread_id, run_id=run_id
+        )
+        run = raw.parse()
         if run.status not in ("queued", "in_progress", "requires_action"):
             return run
-        if time.time() - start > timeout_s:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
             # devolvemos el estado actual (probablemente en progreso)
             return run
-        time.sleep(interval)
-        interval = min(interval * BACKOFF_FACTOR, 2.0)  # no más de 2s
+
+        delay = interval
+        retry_after = raw.headers.get("retry-after")
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        expires_at = getattr(run, "expires_at", None)
+        if expires_at:
+            # Re-consultar justo al expirar en vez de dormir de más
+            delay = min(delay, max(expires_at - time.time(), 0.0) + POLL_INTERVAL)
+        await asyncio.sleep(min(delay, remaining))
+        interval = min(interval * BACKOFF_FACTOR, POLL_MAX_INTERVAL)
 
 
 # =========================
 # Opcional: Streaming
 # =========================
 try:
-    from openai import AssistantEventHandler
+    from openai import AsyncAssistantEventHandler
     HAVE_STREAMING = True
 except Exception:
     HAVE_STREAMING = False
 
 
 if HAVE_STREAMING:
-    class StreamHandler(AssistantEventHandler):
+    class StreamHandler(AsyncAssistantEventHandler):
         @override
-        def on_text_created(self, text) -> None:
+        async def on_text_created(self, text) -> None:
             print("\nassistant >", end="", flush=True)
 
         @override
-        def on_tool_call_created(self, tool_call):
+        async def on_tool_call_created(self, tool_call):
             print(f"\nassistant > {tool_call.type}\n", flush=True)
 
         @override
-        def on_message_done(self, message) -> None:
-            ans, cites = extract_answer_and_citations_from_message(message)
+        async def on_message_done(self, message) -> None:
+            ans, cites = await extract_answer_and_citations_from_message(message)
             print(ans)
             if cites:
                 print("\n=== Citas ===")
                 for c in cites:
                     print("-", c)
 
+    class CaptureHandler(AsyncAssistantEventHandler):
+        """
+        Handler silencioso: guarda (texto, citas) del último mensaje del asistente
+        para devolverlo sin hacer polling del run.
+        """
+        def __init__(self) -> None:
+            super().__init__()
+            self.result: Optional[Tuple[str, List[str]]] = None
+
+        @override
+        async def on_message_done(self, message) -> None:
+            if message.role == "assistant":
+                self.result = await extract_answer_and_citations_from_message(message)
+
 
 # =========================
 # Runner principal
 # =========================
-def ask(
+async def _cancel_run(thread_id: str, run: Any) -> str:
+    """Cancela (best effort) un run que superó POLL_TIMEOUT_S; devuelve su estado."""
+    if run is None:
+        return "timeout"
+    try:
+        await client.beta.threads.runs.cancel(run_id=run.id, thread_id=thread_id)
+    except Exception:
+        pass
+    return run.status
+
+
+async def _timed_out(thread_id: str, run: Any) -> Tuple[str, List[str]]:
+    status = await _cancel_run(thread_id, run)
+    return (f"[ERROR] Run terminó con estado: {status}", [])
+
+
+async def _create_thread(question: str) -> Any:
+    return await client.beta.threads.create(messages=[{"role": "user", "content": question}])
+
+
+_background_tasks: set = set()
+
+
+def _discard_thread(thread_id: str) -> None:
+    """Borra en segundo plano un thread creado de más (hit semántico)."""
+    async def _delete() -> None:
+        try:
+            await client.beta.threads.delete(thread_id)
+        except Exception:
+            pass
+
+    task = asyncio.create_task(_delete())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def ask(
     assistant_id: str,
     question: str,
     *,
     stream: bool = False,
     extra_instructions: Optional[str] = None,
+    debug_chunks: Optional[bool] = None,
 ) -> Tuple[str, List[str]]:
     """
     Crea un thread, envía la pregunta y ejecuta un run (con o sin streaming).
     Devuelve (texto, citas). En streaming imprime en vivo y retorna textos vacíos.
+    `debug_chunks` (por defecto DEBUG_CHUNKS) agrega el conteo de chunks usados.
+    Las preguntas simples (sin stream/extra/debug) pasan por answer_cache: el
+    tier exacto se consulta sin esperar turno en OAI_SEMAPHORE; el embedding
+    del tier semántico corre bajo el semáforo, en paralelo con threads.create.
     """
-    # 1) Crear thread con el mensaje del usuario
-    messages = [{"role": "user", "content": question}]
-    if extra_instructions:
-        # Puedes enriquecer el contexto de la conversación agregando system-like prompt como primer mensaje
-        messages.insert(0, {"role": "assistant", "content": extra_instructions})
-
-    thread = client.beta.threads.create(messages=messages)
+    if debug_chunks is None:
+        debug_chunks = DEBUG_CHUNKS
+    cacheable = not stream and not extra_instructions and not debug_chunks
+
+    if cacheable:
+        hit = answer_cache.lookup_exact(assistant_id, question)
+        if hit is not None:
+            return hit
+
+    async with OAI_SEMAPHORE:
+        vec = None
+        thread = None
+        if cacheable:
+            (hit, vec), thread = await asyncio.gather(
+                answer_cache.lookup_semantic(assistant_id, question),
+                _create_thread(question),
+            )
+            if hit is not None:
+                _discard_thread(thread.id)
+                return hit
+
+        result = await _ask(
+            assistant_id,
+            question,
+            stream=stream,
+            extra_instructions=extra_instructions,
+            debug_chunks=debug_chunks,
+            thread=thread,
+        )
+
+    # No cachear errores ni respuestas vacías
+    if cacheable and not result[0].startswith(("[ERROR]", "[INFO]", "[Sin")):
+        answer_cache.store(assistant_id, question, result, vec)
+    return result
+
+
+async def _ask(
+    assistant_id: str,
+    question: str,
+    *,
+    stream: bool,
+    extra_instructions: Optional[str],
+    debug_chunks: bool,
+    thread: Any = None,
+) -> Tuple[str, List[str]]:
+    # 1) Crear thread con el mensaje del usuario (si no vino ya creado). Las
+    #    instrucciones extra van al run (additional_instructions): no se guardan
+    #    como mensaje en el thread.
+    if thread is None:
+        thread = await _create_thread(question)
+    additional = extra_instructions or NOT_GIVEN
 
     # STREAMING: imprime en vivo y retorna vacío (impresión ya hecha)
     if stream and HAVE_STREAMING:
-        # Nota: puedes pasar instrucciones específicas del run aquí si quieres:
-        with client.beta.threads.runs.stream(
-            thread_id=thread.id,
-            assistant_id=assistant_id,
-            event_handler=StreamHandler(),
-        ) as s:
-            s.until_done()
+        printer = StreamHandler()
+        try:
+            async with asyncio.timeout(POLL_TIMEOUT_S):
+                async with client.beta.threads.runs.stream(
+                    thread_id=thread.id,
+                    assistant_id=assistant_id,
+                    additional_instructions=additional,
+                    event_handler=printer,
+                ) as s:
+                    await s.until_done()
+        except TimeoutError:
+            return await _timed_out(thread.id, printer.current_run)
         return ("", [])
 
-    # 2) Crear run
-    run = client.beta.threads.runs.create(
-        thread_id=thread.id,
-        assistant_id=assistant_id,
-        # instructions=extra_instructions or None,  # opcional
-    )
+    # 2) Ejecutar run: por defecto vía stream (sin polling); polling solo como fallback
+    captured: Optional[Tuple[str, List[str]]] = None
+    if HAVE_STREAMING:
+        handler = CaptureHandler()
+        try:
+            # Mismo tope que el polling: un run trabado no retiene el semáforo
+            async with asyncio.timeout(POLL_TIMEOUT_S):
+                async with client.beta.threads.runs.stream(
+                    thread_id=thread.id,
+                    assistant_id=assistant_id,
+                    additional_instructions=additional,
+                    event_handler=handler,
+                ) as s:
+                    await s.until_done()
+        except TimeoutError:
+            return await _timed_out(thread.id, handler.current_run)
+        run = handler.current_run
+        captured = handler.result
+    else:
+        run = await client.beta.threads.runs.create(
+            thread_id=thread.id,
+            assistant_id=assistant_id,
+            additional_instructions=additional,
+        )
+        # 3) Polling robusto
+        run = await poll_run(thread.id, run.id, timeout_s=POLL_TIMEOUT_S)
 
-    # 3) Polling robusto
-    run = poll_run(thread.id, run.id, timeout_s=POLL_TIMEOUT_S)
+    if run is None:
+        return ("[ERROR] El stream terminó sin devolver un run", [])
 
     # 4) Resolver estados
     if run.status == "requires_action":
@@ -226,22 +456,122 @@ def ask(
     if run.status != "completed":
         return (f"[ERROR] Run terminó con estado: {run.status}", [])
 
-    # 5) Obtener último mensaje
-    msgs = client.beta.threads.messages.list(thread_id=thread.id, order="desc", limit=10)
-    for m in msgs.data:
-        if m.role == "assistant":
-            answer, cites = extract_answer_and_citations_from_message(m)
-
-            # Extra: intentar traer trozos (chunks) de File Search usados
-            fs_chunks = try_fetch_file_search_chunks(thread.id, run.id)
-            if fs_chunks:
-                # No saturar salida; solo decimos cuántos chunks
-                answer += f"\n\n[debug] Chunks usados: {len(fs_chunks)}"
-            return (answer or "[Sin texto]", cites)
+    # 5) Obtener último mensaje (ya capturado si vino del stream) y, solo en
+    #    modo debug, los chunks de File Search en paralelo
+    async def _no_chunks() -> List[str]:
+        return []
+
+    chunks_task = try_fetch_file_search_chunks(thread.id, run.id) if debug_chunks else _no_chunks()
+    if captured is not None:
+        fs_chunks = await chunks_task
+        answer, cites = captured
+        return (_with_debug(answer, fs_chunks) or "[Sin texto]", cites)
+
+    # El thread es nuevo: el mensaje más reciente es la respuesta del asistente
+    msgs, fs_chunks = await asyncio.gather(
+        client.beta.threads.messages.list(thread_id=thread.id, order="desc", limit=1),
+        chunks_task,
+    )
+    if msgs.data and msgs.data[0].role == "assistant":
+        answer, cites = await extract_answer_and_citations_from_message(msgs.data[0])
+        return (_with_debug(answer, fs_chunks) or "[Sin texto]", cites)
 
     return ("[Sin respuesta del asistente]", [])
 
 
+# =========================
+# Streaming hacia HTTP (SSE)
+# =========================
+async def ask_stream(
+    assistant_id: str,
+    question: str,
+    *,
+    extra_instructions: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Igual que ask() pero va entregando eventos a medida que llegan:
+    {"delta": "..."} por cada trozo de texto, {"answer", "citations"} al
+    completar el mensaje y {"error": "..."} si el run no termina bien.
+    """
+    async with OAI_SEMAPHORE:
+        thread = await client.beta.threads.create(messages=[{"role": "user", "content": question}])
+        async with client.beta.threads.runs.stream(
+            thread_id=thread.id,
+            assistant_id=assistant_id,
+            additional_instructions=extra_instructions or NOT_GIVEN,
+        ) as s:
+            # Tope total POLL_TIMEOUT_S con wait_for sobre cada evento: asyncio.timeout no
+            # sirve aquí porque el generador cede el control entre eventos
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + POLL_TIMEOUT_S
+            events = s.__aiter__()
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.__anext__(), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    status = await _cancel_run(thread.id, s.current_run)
+                    yield {"error": f"Run terminó con estado: {status}"}
+                    break
+                if event.event == "thread.message.delta":
+                    for part in event.data.delta.content or []:
+                        value = getattr(getattr(part, "text", None), "value", None)
+                        if part.type == "text" and value:
+                            yield {"delta": value}
+                elif event.event == "thread.message.completed":
+                    answer, cites = await extract_answer_and_citations_from_message(event.data)
+                    yield {"answer": answer or "[Sin texto]", "citations": cites}
+                elif event.event in ("thread.run.failed", "thread.run.expired", "thread.run.cancelled"):
+                    yield {"error": f"Run terminó con estado: {event.data.status}"}
+                elif event.event == "thread.run.requires_action":
+                    yield {"error": "El asistente solicitó una acción (tool call). Aún no implementado."}
+
+
+# =========================
+# Varias preguntas al mismo agente
+# =========================
+_NUMBERED_RE = re.compile(r"^\s*(\d+)\.\s", re.MULTILINE)
+
+
+def _split_numbered(text: str, n: int) -> Optional[List[str]]:
+    """
+    Separa una respuesta con formato '1. ...\n2. ...' en n partes.
+    Devuelve None si la numeración no coincide con lo esperado.
+    """
+    matches = list(_NUMBERED_RE.finditer(text))
+    if [int(m.group(1)) for m in matches] != list(range(1, n + 1)):
+        return None
+    ends = [m.start() for m in matches[1:]] + [len(text)]
+    return [text[m.end():end].strip() for m, end in zip(matches, ends)]
+
+
+async def ask_batch(
+    assistant_id: str,
+    questions: List[str],
+    *,
+    combine: bool = False,
+) -> List[Tuple[str, List[str]]]:
+    """
+    Responde varias preguntas para un mismo asistente.
+    Por defecto lanza un thread por pregunta en paralelo (acotado por OAI_CONCURRENCY).
+    Con `combine=True` envía todas en un solo run numerado y separa la respuesta;
+    las citas son compartidas. Si la respuesta no respeta la numeración, vuelve
+    al modo paralelo.
+    """
+    if combine and len(questions) > 1:
+        prompt = "Responde cada pregunta por separado:\n" + "\n".join(
+            f"{i}) {q}" for i, q in enumerate(questions, 1)
+        )
+        prompt += "\n\nResponde con el formato '1. ...\\n2. ...', una respuesta por pregunta."
+        text, cites = await ask(assistant_id, prompt)
+        parts = _split_numbered(text, len(questions))
+        if parts is not None:
+            return [(part or "[Sin texto]", cites) for part in parts]
+
+    return list(await asyncio.gather(*[ask(assistant_id, q) for q in questions]))
+
+
 # =========================
 # CLI
 # =========================
@@ -251,6 +581,7 @@ def parse_args():
     p.add_argument("question", nargs="+", help="Pregunta al agente")
     p.add_argument("--stream", action="store_true", help="Usar streaming (si está disponible en el SDK)")
     p.add_argument("--extra", type=str, default=None, help="Instrucciones adicionales para este run")
+    p.add_argument("--debug", action="store_true", help="Mostrar cuántos chunks de File Search se usaron")
     return p.parse_args()
 
 
@@ -264,7 +595,15 @@ if __name__ == "__main__":
         sys.exit(1)
 
     assistant_id = AGENT_MAP[target]
-    text, cites = ask(assistant_id, question, stream=args.stream, extra_instructions=args.extra)
+    text, cites = asyncio.run(
+        ask(
+            assistant_id,
+            question,
+            stream=args.stream,
+            extra_instructions=args.extra,
+            debug_chunks=args.debug or None,
+        )
+    )
 
     # En streaming ya se imprimió
     if args.stream and HAVE_STREAMING:
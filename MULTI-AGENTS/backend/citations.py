@@ -0,0 +1,52 @@
+# citations.py
+# Reemplazo de anotaciones de citas por marcadores [n] (sin dependencias de red).
+from typing import Dict, List, Tuple
+
+
+def replace_annotations(value: str, annotations) -> Tuple[str, Dict[int, int]]:
+    """
+    Reemplaza cada fragmento anotado por [n] en una sola pasada usando los
+    offsets start_index/end_index. Si faltan offsets, cae al str.replace previo.
+    Devuelve (texto, marker_for): marker_for[idx] es el [n] que representa a la
+    anotación idx en el texto (una solapada se pliega en la que sobrevive);
+    las anotaciones sin marcador visible no aparecen.
+    """
+    marker_for: Dict[int, int] = {}
+    spans = []
+    for idx, ann in enumerate(annotations):
+        start = getattr(ann, "start_index", None)
+        end = getattr(ann, "end_index", None)
+        if start is None or end is None:
+            break
+        spans.append((start, end, idx))
+    else:
+        out: List[str] = []
+        cur = 0
+        last = None
+        # A igual inicio, la más larga primero: las anidadas se pliegan en ella
+        for start, end, idx in sorted(spans, key=lambda sp: (sp[0], -sp[1], sp[2])):
+            if start < cur and last is not None:
+                # Solapado con la anotación anterior: comparte su marcador y
+                # se descarta también la cola que sobresale
+                marker_for[idx] = last
+                cur = max(cur, end)
+                continue
+            out.append(value[cur:start])
+            out.append(f"[{idx}]")
+            marker_for[idx] = last = idx
+            cur = end
+        out.append(value[cur:])
+        return "".join(out), marker_for
+
+    replaced: Dict[str, int] = {}
+    for idx, ann in enumerate(annotations):
+        text = getattr(ann, "text", None)
+        if not text:
+            continue
+        if text in replaced:
+            # Mismo fragmento ya reemplazado por otra anotación
+            marker_for[idx] = replaced[text]
+        elif text in value:
+            value = value.replace(text, f"[{idx}]")
+            marker_for[idx] = replaced[text] = idx
+    return value, marker_for
@@ -0,0 +1,63 @@
+# config.py
+# Settings únicos del backend: el .env junto a este archivo se lee una sola vez
+# al importar; el resto del código usa atributos de `settings`.
+from pathlib import Path
+from typing import Optional
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).with_name(".env"),
+        env_file_encoding="utf-8",
+        extra="ignore",
+        env_ignore_empty=True,  # VAR= vacía -> valor por defecto
+    )
+
+    # OpenAI / pool HTTP (el SDK ya no ve el .env vía os.environ: se pasan aquí)
+    openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None
+    openai_org_id: Optional[str] = None
+    openai_project_id: Optional[str] = None
+    oai_max_connections: int = 200
+    oai_max_keepalive: int = 100
+    oai_concurrency: int = 32
+
+    # Runs (polling de respaldo)
+    poll_interval: float = 0.1
+    poll_timeout_s: int = 120  # 2 min
+    backoff_factor: float = 1.6  # backoff geométrico
+    poll_max_interval: float = 2.0  # no más de 2s
+    debug_chunks: bool = False
+    filename_cache_size: int = 4096
+
+    # Cache de respuestas
+    answer_cache_size: int = 10000
+    answer_cache_ttl_s: int = 3600
+    semantic_cache_threshold: float = 0.93
+    semantic_cache_size: int = 1000
+    embedding_model: str = "text-embedding-3-small"
+
+    # Auth / API
+    jwt_secret: str = "change_me"
+    public_mode: bool = False
+    admin_user: str = "admin"
+    admin_password: str = "admin123"
+    admin_name: str = "Alejandro"
+    admin_email: str = "admin@example.com"
+
+    # Carga desde carpetas
+    upload_concurrency: int = 8
+
+    @field_validator("public_mode", "debug_chunks", mode="before")
+    @classmethod
+    def _only_true(cls, v):
+        # Igual que os.getenv(...).lower() == "true": "1"/"yes"/"on" NO activan
+        if isinstance(v, bool):
+            return v
+        return str(v).lower() == "true"
+
+
+settings = Settings()
@@ -0,0 +1,20 @@
+# envfile.py
+# Lector compartido de archivos KEY=VALUE (agent_ids.env, vector_store_ids.env).
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+
+
+@lru_cache(maxsize=None)
+def load_kv(path: str) -> Mapping[str, str]:
+    """
+    Parsea un archivo KEY=VALUE (una vez por path; no cambian en runtime).
+    Ignora líneas vacías o sin '='. Devuelve un mapping de solo lectura.
+    Si el archivo no existe lanza FileNotFoundError (no queda cacheado).
+    """
+    return MappingProxyType(dict(
+        line.strip().split("=", 1)
+        for line in Path(path).read_text("utf-8").splitlines()
+        if line.strip() and "=" in line
+    ))
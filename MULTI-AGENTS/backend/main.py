@@ -1,24 +1,29 @@
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Optional
-from pathlib import Path
+from typing import List, Optional
 
-from dotenv import load_dotenv
 from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from openai import OpenAI
+import orjson
 from pydantic import BaseModel
 
-# ================== Cargar .env junto a este archivo ==================
-load_dotenv(dotenv_path=Path(__file__).with_name(".env"))
+# ================== Settings (.env junto a este archivo, leído una vez) ==================
+from config import settings
 
 # Importa utilidades de agentes (tu archivo ask_agent.py debe estar aquí)
 import ask_agent  # requiere ask_agent.py
+import answer_cache
+from envfile import load_kv
+from oai import async_client as client, sync_client
 
 # ================== Seguridad / JWT ==================
-SECRET_KEY = os.getenv("JWT_SECRET", "change_me")
+SECRET_KEY = settings.jwt_secret
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 8 * 60
 
@@ -26,10 +31,21 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 8 * 60
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 # ================== Modo Público ==================
-PUBLIC_MODE = os.getenv("PUBLIC_MODE", "false").lower() == "true"
+PUBLIC_MODE = settings.public_mode
 
 # ================== FastAPI ==================
-app = FastAPI(title="Multi-Agente RAG API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Precarga de filenames en segundo plano: no retrasa el arranque
+    warm = asyncio.create_task(ask_agent.warm_filename_cache())
+    yield
+    warm.cancel()
+
+app = FastAPI(
+    title="Multi-Agente RAG API",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -55,13 +71,13 @@ class AskPayload(BaseModel):
 
 # ================== Helpers Auth ==================
 def authenticate(username: str, password: str) -> Optional[User]:
-    admin_user = os.getenv("ADMIN_USER", "admin")
-    admin_pass = os.getenv("ADMIN_PASSWORD", "admin123")
+    admin_user = settings.admin_user
+    admin_pass = settings.admin_password
     if username == admin_user and password == admin_pass:
         return User(
             username=username,
-            name=os.getenv("ADMIN_NAME", "Alejandro"),
-            email=os.getenv("ADMIN_EMAIL", "admin@example.com"),
+            name=settings.admin_name,
+            email=settings.admin_email,
         )
     return None
 
@@ -116,38 +132,86 @@ def me(current_user: User = Depends(require_user)):
     return current_user
 
 # ================== Agentes & Chat ==================
-@app.get("/agents")
+@app.get("/agents", response_class=ORJSONResponse)
 def list_agents(current_user: User = Depends(require_user)):
     return {"agents": list(ask_agent.AGENT_MAP.keys())}
 
-@app.post("/chat/ask")
-def chat_ask(payload: AskPayload, current_user: User = Depends(require_user)):
+@app.post("/chat/ask", response_class=ORJSONResponse)
+async def chat_ask(
+    payload: AskPayload,
+    debug: bool = False,
+    current_user: User = Depends(require_user),
+):
     agent = payload.agent.lower()
     if agent not in ask_agent.AGENT_MAP:
         raise HTTPException(status_code=400, detail="Agente inválido")
     assistant_id = ask_agent.AGENT_MAP[agent]
-    text, cites = ask_agent.ask(assistant_id, payload.question, stream=False)
+    text, cites = await ask_agent.ask(
+        assistant_id, payload.question, stream=False, debug_chunks=debug or None
+    )
     return {"answer": text, "citations": cites}
 
+@app.post("/chat/ask_stream")
+async def chat_ask_stream(payload: AskPayload, current_user: User = Depends(require_user)):
+    agent = payload.agent.lower()
+    if agent not in ask_agent.AGENT_MAP:
+        raise HTTPException(status_code=400, detail="Agente inválido")
+    assistant_id = ask_agent.AGENT_MAP[agent]
+
+    async def gen():
+        try:
+            async for event in ask_agent.ask_stream(assistant_id, payload.question):
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+
+    return StreamingResponse(
+        gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/chat/ask_batch", response_class=ORJSONResponse)
+async def chat_ask_batch(
+    payloads: List[AskPayload],
+    current_user: User = Depends(require_user),
+):
+    # Agrupar por agente para que cada grupo salga en un solo ask_batch
+    groups = {}
+    for i, payload in enumerate(payloads):
+        agent = payload.agent.lower()
+        if agent not in ask_agent.AGENT_MAP:
+            raise HTTPException(status_code=400, detail=f"Agente inválido: {payload.agent}")
+        groups.setdefault(agent, []).append((i, payload.question))
+
+    results = [None] * len(payloads)
+    answers = await asyncio.gather(*[
+        ask_agent.ask_batch(ask_agent.AGENT_MAP[agent], [q for _, q in items])
+        for agent, items in groups.items()
+    ])
+    for items, group_answers in zip(groups.values(), answers):
+        for (i, _), (text, cites) in zip(items, group_answers):
+            results[i] = {"answer": text, "citations": cites}
+    return {"results": results}
+
+@app.get("/chat/cache_stats")
+def chat_cache_stats(current_user: User = Depends(require_user)):
+    return answer_cache.CACHE_STATS
+
 # ================== Vector Stores (upload) ==================
 VS_KEYS = {"comercial": "VS_COMERCIAL", "soporte": "VS_SOPORTE", "documental": "VS_DOCUMENTAL"}
 ALLOWED_EXTS = {".pdf", ".docx", ".txt", ".md", ".csv"}
 
 def load_vs_ids(path="vector_store_ids.env"):
-    ids = {}
-    if not os.path.exists(path):
+    # load_kv memoiza: tras el primer éxito no se vuelve a tocar el disco
+    try:
+        return load_kv(path)
+    except FileNotFoundError:
         raise RuntimeError("No se encontró vector_store_ids.env")
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or "=" not in line:
-                continue
-            k, v = line.split("=", 1)
-            ids[k] = v
-    return ids
 
 @app.post("/vs/upload")
-def upload_to_vector_store(
+async def upload_to_vector_store(
     agent: str = Form(...),
     file: UploadFile = File(...),
     current_user: User = Depends(require_user),
@@ -166,19 +230,21 @@ def upload_to_vector_store(
     if not vs_id:
         raise HTTPException(status_code=500, detail=f"No hay ID para {vs_key} en vector_store_ids.env")
 
-    client = OpenAI()
-    
     try:
         # Reinicia el puntero del archivo
-        file.file.seek(0)
+        await file.seek(0)
 
-        # Pasar como tupla (nombre, fileobj, content_type) → compatible con SDK 1.x
-        uploaded = client.files.create(
+        # Pasar como tupla (nombre, fileobj, content_type) → compatible con SDK 1.x.
+        # httpx envía el fileobj por chunks en el multipart (Content-Length vía
+        # seek/tell) sin cargarlo entero en memoria, pero sus .read() son síncronos:
+        # la subida corre en el threadpool para no bloquear el event loop.
+        uploaded = await run_in_threadpool(
+            sync_client.files.create,
             file=(file.filename, file.file, file.content_type or "application/octet-stream"),
             purpose="assistants",
         )
 
-        client.vector_stores.files.create(
+        await client.vector_stores.files.create(
             vector_store_id=vs_id,
             file_id=uploaded.id
         )
@@ -0,0 +1,31 @@
+# oai.py
+# Clientes OpenAI compartidos: un solo pool httpx por cliente (keep-alive +
+# HTTP/2) para no pagar TCP+TLS en cada llamada.
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from config import settings
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=settings.oai_max_connections,
+    max_keepalive_connections=settings.oai_max_keepalive,
+)
+
+_client_kwargs = dict(
+    api_key=settings.openai_api_key,
+    base_url=settings.openai_base_url,
+    organization=settings.openai_org_id,
+    project=settings.openai_project_id,
+)
+
+async_client = AsyncOpenAI(
+    **_client_kwargs,
+    http_client=DefaultAsyncHttpxClient(http2=True, limits=HTTP_LIMITS),
+)
+
+# Para subir archivos desde un hilo: httpx lee los fileobj de forma síncrona
+# al armar el multipart, y eso no debe ocurrir en el event loop.
+sync_client = OpenAI(
+    **_client_kwargs,
+    http_client=DefaultHttpxClient(http2=True, limits=HTTP_LIMITS),
+)
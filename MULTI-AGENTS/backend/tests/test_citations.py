@@ -0,0 +1,35 @@
+from types import SimpleNamespace as Ann
+
+from citations import replace_annotations
+
+
+def test_disjoint_spans():
+    text, marker_for = replace_annotations(
+        "0123456789", [Ann(start_index=2, end_index=4), Ann(start_index=6, end_index=8)]
+    )
+    assert text == "01[0]45[1]89"
+    assert marker_for == {0: 0, 1: 1}
+
+
+def test_overlapping_spans_fold_into_first_marker():
+    text, marker_for = replace_annotations(
+        "0123456789", [Ann(start_index=2, end_index=5), Ann(start_index=3, end_index=6)]
+    )
+    assert text == "01[0]6789"
+    assert marker_for == {0: 0, 1: 0}
+
+
+def test_nested_spans_fold_into_outer_marker():
+    text, marker_for = replace_annotations(
+        "0123456789", [Ann(start_index=2, end_index=8), Ann(start_index=2, end_index=4)]
+    )
+    assert text == "01[0]89"
+    assert marker_for == {0: 0, 1: 0}
+
+
+def test_fallback_without_offsets_folds_repeated_text():
+    text, marker_for = replace_annotations(
+        "hola XX mundo YY", [Ann(text="XX"), Ann(text="XX"), Ann(text="ZZ"), Ann(text="YY")]
+    )
+    assert text == "hola [0] mundo [3]"
+    assert marker_for == {0: 0, 1: 0, 3: 3}
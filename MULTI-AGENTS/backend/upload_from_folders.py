@@ -1,8 +1,10 @@
 # upload_from_folders.py
-import os, sys
+import sys, asyncio, hashlib, json
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
+
+from config import settings
+from envfile import load_kv
+from oai import async_client
 
 # --- Config ---
 FOLDER_TO_VS_KEY = {
@@ -11,16 +13,10 @@ FOLDER_TO_VS_KEY = {
     "doc_documentos": "VS_DOCUMENTAL",
 }
 ALLOWED_EXTS = {".pdf", ".docx", ".txt", ".md", ".csv"}  # puedes ampliar
+MANIFEST_PATH = Path("upload_manifest.json")  # sha256 -> {vs_id: file_id}
 
 def load_vs_ids(env_path="vector_store_ids.env"):
-    ids = {}
-    with open(env_path, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip(): 
-                continue
-            k, v = line.strip().split("=", 1)
-            ids[k] = v
-    return ids
+    return load_kv(env_path)
 
 def iter_files(root: Path):
     for folder_name in FOLDER_TO_VS_KEY.keys():
@@ -32,15 +28,80 @@ def iter_files(root: Path):
             if p.is_file() and p.suffix.lower() in ALLOWED_EXTS:
                 yield folder_name, p
 
-def main():
-    load_dotenv()
-    client = OpenAI()
+def sha256_of(p: Path) -> str:
+    with open(p, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+def load_manifest():
+    if not MANIFEST_PATH.exists():
+        return {}
+    manifest = json.loads(MANIFEST_PATH.read_text("utf-8") or "{}")
+    # Formato anterior: sha256 -> {"vs": vs_id, "file_id": file_id}
+    for h, entry in manifest.items():
+        if "vs" in entry and "file_id" in entry:
+            manifest[h] = {entry["vs"]: entry["file_id"]}
+    return manifest
+
+def save_manifest(manifest):
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2), "utf-8")
+
+async def list_vs_file_ids(client, vs_id: str):
+    """IDs de archivos ya adjuntos al vector store (None si no se pudo listar)."""
+    try:
+        return {f.id async for f in client.vector_stores.files.list(vector_store_id=vs_id)}
+    except Exception as e:
+        print(f"[WARN] No pude listar {vs_id}, se confía en el manifest: {e}")
+        return None
+
+async def upload_one(client, sem, folder_name, path: Path) -> str:
+    async with sem:
+        print(f"[SUBIENDO] {folder_name} -> {path.name}")
+        # Leer en un hilo para no bloquear el event loop
+        data = await asyncio.to_thread(path.read_bytes)
+        up = await client.files.create(file=(path.name, data), purpose="assistants")
+        return up.id
+
+async def attach_batch(client, vs_id: str, file_ids):
+    """
+    Adjunta todos los file_ids al vector store en un solo batch y espera la indexación.
+    Devuelve el set de file_ids que no quedaron 'completed' (fallidos,
+    cancelados o aún pendientes si el batch terminó cancelado).
+    """
+    batch = await client.vector_stores.file_batches.create_and_poll(
+        vector_store_id=vs_id, file_ids=file_ids
+    )
+    if batch.status == "completed" and batch.file_counts.completed == len(file_ids):
+        return set()
+    completed_ids = set()
+    async for f in client.vector_stores.file_batches.list_files(
+        batch_id=batch.id, vector_store_id=vs_id, filter="completed"
+    ):
+        completed_ids.add(f.id)
+    return set(file_ids) - completed_ids
+
+async def delete_files(client, file_ids):
+    """Borra File objects que no se indexaron para no dejarlos huérfanos en la cuenta."""
+    results = await asyncio.gather(
+        *[client.files.delete(fid) for fid in file_ids], return_exceptions=True
+    )
+    for fid, res in zip(file_ids, results):
+        if isinstance(res, Exception):
+            print(f"[WARN] No pude borrar {fid}: {res}")
+
+async def main():
+    client = async_client
     vs_ids = load_vs_ids()
+    sem = asyncio.Semaphore(settings.upload_concurrency)
 
     root = Path(".").resolve()
     total, ok, skipped, failed = 0, 0, 0, 0
+    manifest = load_manifest()
+    vs_files = {}  # vs_id -> set(file_id) | None
+    hashes = {}  # path -> sha256
+    seen = set()  # (sha256, vs_id) ya encolados en esta corrida
 
     print("== Iniciando carga desde carpetas ==")
+    jobs = []
     for folder_name, path in iter_files(root):
         total += 1
         vs_key = FOLDER_TO_VS_KEY[folder_name]
@@ -50,16 +111,71 @@ def main():
             failed += 1
             continue
 
-        # Evita volver a subir el mismo archivo exacto (opcional: por nombre)
-        # Puedes cambiar esta lógica por hashes si quieres algo más estricto.
+        # Evita volver a subir el mismo archivo exacto (por contenido)
+        h = hashes[path] = sha256_of(path)
+        known_id = manifest.get(h, {}).get(vs_id)
+        if known_id:
+            if vs_id not in vs_files:
+                vs_files[vs_id] = await list_vs_file_ids(client, vs_id)
+            if vs_files[vs_id] is None or known_id in vs_files[vs_id]:
+                print(f"[OMITIDO] {folder_name} -> {path.name} (sin cambios)")
+                skipped += 1
+                continue
+        if (h, vs_id) in seen:
+            print(f"[OMITIDO] {folder_name} -> {path.name} (duplicado)")
+            skipped += 1
+            continue
+        seen.add((h, vs_id))
+        jobs.append((path, vs_id, upload_one(client, sem, folder_name, path)))
+
+    # 1) Subidas concurrentes; un fallo no cancela el resto
+    results = await asyncio.gather(*[job for _, _, job in jobs], return_exceptions=True)
+    by_vs = {}  # vs_id -> [(path, file_id)]
+    for (path, vs_id, _), res in zip(jobs, results):
+        if isinstance(res, Exception):
+            failed += 1
+            print(f"[ERROR] {path.name}: {res}")
+        else:
+            by_vs.setdefault(vs_id, []).append((path, res))
+
+    # 2) Un batch de attach por vector store; se reintenta una vez lo que falle
+    for vs_id, uploaded in by_vs.items():
+        print(f"[ADJUNTANDO] {len(uploaded)} archivo(s) -> {vs_id}")
+        created = [fid for _, fid in uploaded]  # para limpiar si algo revienta
         try:
-            print(f"[SUBIENDO] {folder_name} -> {path.name}")
-            up = client.files.create(file=open(path, "rb"), purpose="assistants")
-            client.vector_stores.files.create(vector_store_id=vs_id, file_id=up.id)
-            ok += 1
+            failed_ids = await attach_batch(client, vs_id, [fid for _, fid in uploaded])
+            attached = [(p, fid) for p, fid in uploaded if fid not in failed_ids]
+            if failed_ids:
+                retry = [p for p, fid in uploaded if fid in failed_ids]
+                print(f"[REINTENTO] {len(retry)} archivo(s) fallaron al indexar en {vs_id}")
+                await delete_files(client, list(failed_ids))
+                created = [fid for fid in created if fid not in failed_ids]
+                reup = await asyncio.gather(
+                    *[upload_one(client, sem, "reintento", p) for p in retry],
+                    return_exceptions=True,
+                )
+                reuploaded = [(p, fid) for p, fid in zip(retry, reup) if not isinstance(fid, Exception)]
+                created += [fid for _, fid in reuploaded]
+                still_failed = (
+                    await attach_batch(client, vs_id, [fid for _, fid in reuploaded]) if reuploaded else set()
+                )
+                if still_failed:
+                    await delete_files(client, list(still_failed))
+                    created = [fid for fid in created if fid not in still_failed]
+                attached += [(p, fid) for p, fid in reuploaded if fid not in still_failed]
+            for p, fid in attached:
+                manifest.setdefault(hashes[p], {})[vs_id] = fid
+            save_manifest(manifest)
+
+            ok += len(attached)
+            failed += len(uploaded) - len(attached)
         except Exception as e:
-            failed += 1
-            print(f"[ERROR] {path.name}: {e}")
+            failed += len(uploaded)
+            print(f"[ERROR] batch {vs_id}: {e}")
+            # No quedan en el manifest: se volverán a subir, así que no dejarlos huérfanos
+            for p, _ in uploaded:
+                manifest.get(hashes[p], {}).pop(vs_id, None)
+            await delete_files(client, created)
 
     print("\n== Resumen ==")
     print(f"Total encontrados: {total}")
@@ -69,6 +185,6 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        asyncio.run(main())
     except KeyboardInterrupt:
         sys.exit(1)